@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -22,6 +23,12 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     
+    # Webhooks
+    webhook_queue_size: int = Field(1000, ge=1)
+    webhook_workers: int = Field(4, ge=1)
+    webhook_batch_size: int = Field(100, ge=1)
+    webhook_shutdown_timeout: float = 30.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,8 +1,7 @@
 from supabase import create_client, Client
 from notion_client import Client as NotionClient
 from typing import List, Dict, Any, Optional
-import hashlib
-import json
+import logging
 from datetime import datetime
 
 from config import settings
@@ -12,6 +11,25 @@ from models import (
     ConfidenceScore, 
     DataResponse
 )
+from validators import compute_data_hash
+
+logger = logging.getLogger(__name__)
+
+
+def _first_plain_text(items: List[Dict[str, Any]]) -> Optional[str]:
+    """Return the plain text of the first rich text item, if any."""
+    return items[0]['plain_text'] if items else None
+
+
+# Notion property type -> value extractor; other types fall back to prop[type]
+_PROPERTY_EXTRACTORS = {
+    'title': lambda prop: _first_plain_text(prop.get('title', [])),
+    'rich_text': lambda prop: _first_plain_text(prop.get('rich_text', [])),
+    'number': lambda prop: prop.get('number'),
+    'select': lambda prop: prop['select']['name'] if prop.get('select') else None,
+    'multi_select': lambda prop: [item['name'] for item in prop.get('multi_select', [])],
+    'date': lambda prop: prop['date']['start'] if prop.get('date') else None,
+}
 
 
 class SupabaseClient:
@@ -25,8 +43,7 @@ class SupabaseClient:
     
     def _calculate_data_hash(self, data: Any) -> str:
         """Calculate hash of data for verification."""
-        data_str = json.dumps(data, sort_keys=True, default=str)
-        return hashlib.sha256(data_str.encode()).hexdigest()
+        return compute_data_hash(data)
     
     async def query(self, table: str, filters: Optional[Dict[str, Any]] = None) -> List[DataResponse]:
         """Query Supabase table with source tracking."""
@@ -68,7 +85,7 @@ class SupabaseClient:
             return results
             
         except Exception as e:
-            print(f"Supabase query error: {str(e)}")
+            logger.error("Supabase query error: %s", e)
             return [self._create_error_response(table, filters, str(e))]
     
     def _calculate_confidence(self, data: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> ConfidenceScore:
@@ -160,8 +177,7 @@ class NotionDatabaseClient:
     
     def _calculate_data_hash(self, data: Any) -> str:
         """Calculate hash of data for verification."""
-        data_str = json.dumps(data, sort_keys=True, default=str)
-        return hashlib.sha256(data_str.encode()).hexdigest()
+        return compute_data_hash(data)
     
     async def query(self, filters: Optional[Dict[str, Any]] = None) -> List[DataResponse]:
         """Query Notion database with source tracking."""
@@ -203,7 +219,7 @@ class NotionDatabaseClient:
             return results
             
         except Exception as e:
-            print(f"Notion query error: {str(e)}")
+            logger.error("Notion query error: %s", e)
             return [self._create_error_response(filters, str(e))]
     
     def _build_notion_filter(self, filters: Dict[str, Any]) -> Dict[str, Any]:
@@ -230,29 +246,12 @@ class NotionDatabaseClient:
     def _extract_properties(self, properties: Dict[str, Any]) -> Dict[str, Any]:
         """Extract property values from Notion property objects."""
         extracted = {}
+        extractors = _PROPERTY_EXTRACTORS
         
         for key, prop in properties.items():
             prop_type = prop.get('type')
-            
-            if prop_type == 'title':
-                title_list = prop.get('title', [])
-                extracted[key] = title_list[0]['plain_text'] if title_list else None
-            elif prop_type == 'rich_text':
-                text_list = prop.get('rich_text', [])
-                extracted[key] = text_list[0]['plain_text'] if text_list else None
-            elif prop_type == 'number':
-                extracted[key] = prop.get('number')
-            elif prop_type == 'select':
-                select = prop.get('select')
-                extracted[key] = select['name'] if select else None
-            elif prop_type == 'multi_select':
-                multi = prop.get('multi_select', [])
-                extracted[key] = [item['name'] for item in multi]
-            elif prop_type == 'date':
-                date = prop.get('date')
-                extracted[key] = date['start'] if date else None
-            else:
-                extracted[key] = prop.get(prop_type)
+            extractor = extractors.get(prop_type)
+            extracted[key] = extractor(prop) if extractor else prop.get(prop_type)
         
         return extracted
     
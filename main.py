@@ -1,6 +1,11 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any, Optional
+from fastapi.responses import Response
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Literal
+import asyncio
+import json
+import logging
 import uvicorn
 
 from config import settings
@@ -17,11 +22,62 @@ from validators import DataValidator
 from prompt_templates import AntiHallucinationPrompts
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run one webhook worker per queue shard for the lifetime of the app."""
+    shard_size = max(1, settings.webhook_queue_size // settings.webhook_workers)
+    app.state.webhook_queues = [
+        asyncio.Queue(maxsize=shard_size) for _ in range(settings.webhook_workers)
+    ]
+    app.state.pending_updates = {}
+    app.state.dequeued_webhooks = set()
+    workers = [
+        asyncio.create_task(webhook_worker(
+            queue,
+            app.state.pending_updates,
+            app.state.dequeued_webhooks
+        ))
+        for queue in app.state.webhook_queues
+    ]
+    
+    yield
+    
+    # Queued events were already acknowledged, so drain them before stopping
+    queues = app.state.webhook_queues
+    dequeued = app.state.dequeued_webhooks
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(queue.join() for queue in queues)),
+            timeout=settings.webhook_shutdown_timeout
+        )
+    except asyncio.TimeoutError:
+        queued = sum(queue.qsize() for queue in queues)
+        logger.warning(
+            "Webhook drain timed out with %d event(s) unfinished (%d queued, %d dequeued)",
+            queued + len(dequeued), queued, len(dequeued)
+        )
+    
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    
+    if dequeued:
+        logger.error(
+            "Dropped %d dequeued webhook(s) on shutdown: %s",
+            len(dequeued),
+            ", ".join(sorted(entry.payload.record_id for entry in dequeued))
+        )
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Hybrid Memory Integration API",
     description="Real-time memory integration with Supabase and Notion with anti-hallucination mechanisms",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -38,6 +94,23 @@ supabase_client = SupabaseClient()
 notion_client = NotionDatabaseClient()
 validator = DataValidator()
 
+# The accepted response is static apart from event_type/record_id, so its
+# JSON is prebuilt and only the variable tail is encoded per request
+_WEBHOOK_ACCEPTED_PREFIX = (
+    b'{"status":"accepted",'
+    b'"message":"Webhook payload received and queued for processing",'
+)
+_compact_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def webhook_accepted_response(payload: WebhookPayload) -> Response:
+    """Build the accepted response for a queued webhook payload."""
+    tail = _compact_json({"event_type": payload.event_type, "record_id": payload.record_id})
+    return Response(
+        content=_WEBHOOK_ACCEPTED_PREFIX + tail[1:].encode(),
+        media_type="application/json"
+    )
+
 
 @app.get("/")
 async def root():
@@ -82,7 +155,7 @@ async def query_multi_source(request: QueryRequest) -> MultiSourceResponse:
             supabase_results = await supabase_client.query("your_table_name", filters)
             all_responses.extend(supabase_results)
         except Exception as e:
-            print(f"Supabase query failed: {str(e)}")
+            logger.error("Supabase query failed: %s", e)
     
     if SourceType.NOTION in request.sources:
         try:
@@ -90,7 +163,7 @@ async def query_multi_source(request: QueryRequest) -> MultiSourceResponse:
             notion_results = await notion_client.query(filters)
             all_responses.extend(notion_results)
         except Exception as e:
-            print(f"Notion query failed: {str(e)}")
+            logger.error("Notion query failed: %s", e)
     
     # Calculate aggregated confidence
     aggregated_confidence = validator.calculate_aggregated_confidence(all_responses)
@@ -136,9 +209,7 @@ async def query_supabase(
         results = await supabase_client.query(table, filters)
         
         # Enforce confidence threshold
-        valid_results = validator.enforce_confidence_threshold(results)
-        
-        if not valid_results and results:
+        if results and not validator.any_meets_confidence_threshold(results):
             # All results failed threshold
             raise HTTPException(
                 status_code=200,
@@ -162,9 +233,7 @@ async def query_notion(
         results = await notion_client.query(filters)
         
         # Enforce confidence threshold
-        valid_results = validator.enforce_confidence_threshold(results)
-        
-        if not valid_results and results:
+        if results and not validator.any_meets_confidence_threshold(results):
             raise HTTPException(
                 status_code=200,
                 detail={
@@ -179,10 +248,7 @@ async def query_notion(
 
 
 @app.post("/api/v1/webhooks/supabase")
-async def supabase_webhook(
-    payload: WebhookPayload,
-    background_tasks: BackgroundTasks
-):
+async def supabase_webhook(payload: WebhookPayload):
     """Webhook endpoint for Supabase real-time updates."""
     # Validate webhook payload
     if payload.source != SourceType.SUPABASE:
@@ -191,22 +257,14 @@ async def supabase_webhook(
             detail="Invalid source type for Supabase webhook"
         )
     
-    # Process webhook in background
-    background_tasks.add_task(process_webhook, payload)
+    # Queue for the background worker pool
+    enqueue_webhook(payload)
     
-    return {
-        "status": "accepted",
-        "message": "Webhook payload received and queued for processing",
-        "event_type": payload.event_type,
-        "record_id": payload.record_id
-    }
+    return webhook_accepted_response(payload)
 
 
 @app.post("/api/v1/webhooks/notion")
-async def notion_webhook(
-    payload: WebhookPayload,
-    background_tasks: BackgroundTasks
-):
+async def notion_webhook(payload: WebhookPayload):
     """Webhook endpoint for Notion real-time updates."""
     if payload.source != SourceType.NOTION:
         raise HTTPException(
@@ -214,19 +272,21 @@ async def notion_webhook(
             detail="Invalid source type for Notion webhook"
         )
     
-    background_tasks.add_task(process_webhook, payload)
+    enqueue_webhook(payload)
     
-    return {
-        "status": "accepted",
-        "message": "Webhook payload received and queued for processing",
-        "event_type": payload.event_type,
-        "record_id": payload.record_id
-    }
+    return webhook_accepted_response(payload)
 
 
 @app.post("/api/v1/prompt/generate")
-async def generate_llm_prompt(request: QueryRequest):
-    """Generate anti-hallucination LLM prompt from query."""
+async def generate_llm_prompt(
+    request: QueryRequest,
+    prompt_format: Literal["template", "anthropic"] = "template"
+):
+    """Generate anti-hallucination LLM prompt from query.
+    
+    ``prompt_format=anthropic`` returns the prompt as Anthropic Messages API
+    ``system``/``messages`` fields in place of the template.
+    """
     # Query data sources
     all_responses: List[DataResponse] = []
     
@@ -248,6 +308,11 @@ async def generate_llm_prompt(request: QueryRequest):
         threshold
     )
     
+    if prompt_format == "anthropic":
+        prompt_fields = {"anthropic_request": prompt_template.to_anthropic_request()}
+    else:
+        prompt_fields = {"prompt": prompt_template.dict()}
+    
     # Check if we should return "I don't know"
     aggregated_confidence = validator.calculate_aggregated_confidence(all_responses)
     
@@ -259,22 +324,109 @@ async def generate_llm_prompt(request: QueryRequest):
         )
         
         return {
-            "prompt": prompt_template.dict(),
+            **prompt_fields,
             "should_use_dont_know": True,
             "dont_know_response": dont_know_response,
             "aggregated_confidence": aggregated_confidence
         }
     
     return {
-        "prompt": prompt_template.dict(),
+        **prompt_fields,
         "should_use_dont_know": False,
         "aggregated_confidence": aggregated_confidence
     }
 
 
+class QueuedWebhook:
+    """Queue entry whose payload can be replaced while it is still waiting."""
+    __slots__ = ('payload',)
+    
+    def __init__(self, payload: WebhookPayload):
+        self.payload = payload
+
+
+def webhook_key(payload: WebhookPayload) -> tuple:
+    """Identify the record a webhook payload refers to."""
+    return (payload.source, payload.table_name, payload.record_id)
+
+
+def enqueue_webhook(payload: WebhookPayload):
+    """Queue a webhook payload for the worker pool, rejecting it when its shard is full.
+    
+    Consecutive updates are coalesced per record: while an update is still
+    waiting in the queue, a newer update replaces its payload instead of
+    queueing again. Inserts and deletes are never replaced or merged, and an
+    update arriving after one queues behind it. Records are routed to a fixed
+    shard, so events for one record are always handled by the same worker,
+    in order.
+    """
+    pending = app.state.pending_updates
+    queues = app.state.webhook_queues
+    key = webhook_key(payload)
+    is_update = payload.event_type == "update"
+    
+    if is_update and key in pending:
+        pending[key].payload = payload
+        return
+    
+    entry = QueuedWebhook(payload)
+    try:
+        queues[hash(key) % len(queues)].put_nowait(entry)
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Webhook queue is full, retry later"
+        )
+    
+    if is_update:
+        pending[key] = entry
+    else:
+        pending.pop(key, None)
+
+
+async def webhook_worker(
+    queue: asyncio.Queue,
+    pending: Dict[tuple, QueuedWebhook],
+    dequeued: set
+):
+    """Process queued webhook payloads in batches until cancelled.
+    
+    Waits for one event, then takes whatever else is already queued (up to
+    ``webhook_batch_size``) without awaiting the queue again, so a lone event
+    is not delayed. Failures are logged per payload and do not stop the batch.
+    Entries stay in ``dequeued`` until processed, so shutdown can account for
+    a batch that was taken off the queue but not finished.
+    """
+    batch_size = settings.webhook_batch_size
+    
+    while True:
+        entries = [await queue.get()]
+        while len(entries) < batch_size and not queue.empty():
+            entries.append(queue.get_nowait())
+        dequeued.update(entries)
+        
+        # Dequeued updates are no longer open for coalescing
+        for entry in entries:
+            key = webhook_key(entry.payload)
+            if pending.get(key) is entry:
+                del pending[key]
+        
+        for entry in entries:
+            try:
+                await process_webhook(entry.payload)
+            except Exception:
+                logger.exception("Webhook processing failed for %s", entry.payload.record_id)
+            # Not reached on cancellation, so an interrupted entry stays unfinished
+            dequeued.discard(entry)
+            queue.task_done()
+
+
 async def process_webhook(payload: WebhookPayload):
     """Process webhook payload in background."""
-    print(f"Processing webhook: {payload.event_type} for {payload.source} - {payload.record_id}")
+    logger.info(
+        "Processing webhook: %s for %s - %s",
+        payload.event_type, payload.source, payload.record_id
+    )
     
     # Here you would implement your webhook processing logic:
     # - Update local cache
@@ -283,9 +435,10 @@ async def process_webhook(payload: WebhookPayload):
     # - Update confidence scores
     # etc.
     
-    # Example: Log the event
-    print(f"Webhook data: {payload.data}")
-    print(f"Timestamp: {payload.timestamp}")
+    # Example: Log the event (the payload dump is only built at DEBUG)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Webhook data: %s", payload.data)
+        logger.debug("Timestamp: %s", payload.timestamp)
 
 
 if __name__ == "__main__":
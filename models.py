@@ -85,4 +85,24 @@ class LLMPromptTemplate(BaseModel):
     user_prompt: str
     retrieved_data: List[DataResponse]
     strict_mode: bool = Field(default=True, description="Enforce strict 'I don't know' policy")
-    confidence_threshold: float = Field(default=0.85)
\ No newline at end of file
+    confidence_threshold: float = Field(default=0.85)
+    
+    def to_anthropic_request(self) -> Dict[str, Any]:
+        """Render as Anthropic Messages API ``system``/``messages`` fields.
+        
+        The system prompt is identical across requests, so it is sent as a
+        ``cache_control`` block that prompt caching can reuse; only the user
+        message varies per query.
+        """
+        return {
+            "system": [
+                {
+                    "type": "text",
+                    "text": self.system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ],
+            "messages": [
+                {"role": "user", "content": self.user_prompt}
+            ]
+        }
@@ -1,14 +1,14 @@
-from typing import List
-from models import DataResponse, LLMPromptTemplate
+from functools import lru_cache
+from typing import Iterator, List
+from models import DataResponse, LLMPromptTemplate, SourceType
 
 
-class AntiHallucinationPrompts:
-    """Prompt templates with anti-hallucination mechanisms."""
-    
-    @staticmethod
-    def create_strict_system_prompt() -> str:
-        """Create system prompt with strict anti-hallucination rules."""
-        return """You are a precise information retrieval assistant with STRICT anti-hallucination protocols.
+# Enum values resolved once; indexing this is cheaper than SourceType.value
+_SOURCE_TYPE_VALUES = {source_type: source_type.value for source_type in SourceType}
+
+# Built once at import and returned by reference, so every template shares a
+# byte-identical system prompt.
+_STRICT_SYSTEM_PROMPT = """You are a precise information retrieval assistant with STRICT anti-hallucination protocols.
 
 CRITICAL RULES:
 1. ONLY use information from the provided retrieved data sources
@@ -30,39 +30,30 @@ NEVER:
 - Extrapolate beyond the data
 - Ignore low confidence scores
 - Provide information without source citations"""
-    
-    @staticmethod
-    def create_user_prompt(query: str, retrieved_data: List[DataResponse], confidence_threshold: float) -> str:
-        """Create user prompt with retrieved data context."""
-        prompt = f"""Query: {query}
+
+_render_user_prompt_header = """Query: {query}
 
 Confidence Threshold: {confidence_threshold}
 
 RETRIEVED DATA SOURCES:
-"""
-        
-        for idx, data in enumerate(retrieved_data, 1):
-            prompt += f"""\n--- Source {idx} ---
-Source Type: {data.source_metadata.source_type.value}
-Source ID: {data.source_metadata.source_id}
-Table/Database: {data.source_metadata.table_name}
-Confidence Score: {data.confidence.score:.3f}
-Confidence Reasoning: {data.confidence.reasoning}
-Information Found: {not data.information_not_found}
-Verified: {data.verified}
-"""
-            
-            if data.information_not_found:
-                prompt += "Data: NONE - Information not found\n"
-            elif data.data:
-                prompt += f"Data: {data.data}\n"
-            else:
-                prompt += "Data: NONE\n"
-            
-            if data.additional_context:
-                prompt += f"Additional Context: {data.additional_context}\n"
-        
-        prompt += """\n--- END OF RETRIEVED DATA ---
+""".format
+
+# Per-source block of the user prompt, bound once at import so each source
+# only fills in its dynamic slots. Optional lines are chosen by the caller
+# and passed in, keeping the template itself branch-free.
+_render_source_block = """
+--- Source {idx} ---
+Source Type: {source_type}
+Source ID: {source_id}
+Table/Database: {table_name}
+Confidence Score: {score:.3f}
+Confidence Reasoning: {reasoning}
+Information Found: {information_found}
+Verified: {verified}
+{data_line}{context_line}""".format
+
+# Invariant trailer of every user prompt
+_USER_PROMPT_INSTRUCTIONS = """\n--- END OF RETRIEVED DATA ---
 
 INSTRUCTIONS:
 1. Analyze ONLY the retrieved data above
@@ -72,20 +63,109 @@ INSTRUCTIONS:
 5. If data is insufficient or confidence too low, respond: "I don't know. [Reason: ...]"
 
 Provide your response:"""
+
+_DATA_NOT_FOUND_LINE = "Data: NONE - Information not found\n"
+_DATA_NONE_LINE = "Data: NONE\n"
+
+
+def _iter_sources_section(retrieved_data: List[DataResponse]) -> Iterator[str]:
+    """Yield the per-source blocks and the instructions trailer of the user prompt."""
+    for idx, data in enumerate(retrieved_data, 1):
+        # Bind attribute chains once per source
+        sm = data.source_metadata
+        conf = data.confidence
+        not_found = data.information_not_found
+        payload = data.data
+        additional_context = data.additional_context
         
-        return prompt
+        if not_found:
+            data_line = _DATA_NOT_FOUND_LINE
+        elif payload:
+            data_line = f"Data: {payload}\n"
+        else:
+            data_line = _DATA_NONE_LINE
+        
+        yield _render_source_block(
+            idx=idx,
+            source_type=_SOURCE_TYPE_VALUES[sm.source_type],
+            source_id=sm.source_id,
+            table_name=sm.table_name,
+            score=conf.score,
+            reasoning=conf.reasoning,
+            information_found=not not_found,
+            verified=data.verified,
+            data_line=data_line,
+            context_line=f"Additional Context: {additional_context}\n" if additional_context else ""
+        )
+    
+    yield _USER_PROMPT_INSTRUCTIONS
+
+
+@lru_cache(maxsize=2048)
+def _format_dont_know(reason: str, fingerprint: tuple) -> str:
+    """Render an 'I don't know' response from per-source fingerprints.
+    
+    Each fingerprint entry is ``(source_type, information_not_found, score, reasoning)``;
+    the same dead or empty sources tend to recur, so results are memoized.
+    """
+    parts = [f"I don't know. {reason}\n\nData Quality Summary:\n"]
+    
+    for idx, (src_type, not_found, score, reasoning) in enumerate(fingerprint, 1):
+        if not_found:
+            parts.append(f"- Source {idx} ({src_type}): No information found\n")
+        else:
+            parts.append(f"- Source {idx} ({src_type}): Confidence {score:.3f} - {reasoning}\n")
+    
+    return "".join(parts)
+
+
+class AntiHallucinationPrompts:
+    """Prompt templates with anti-hallucination mechanisms."""
+    
+    @staticmethod
+    def create_strict_system_prompt() -> str:
+        """Create system prompt with strict anti-hallucination rules."""
+        return _STRICT_SYSTEM_PROMPT
+    
+    @staticmethod
+    def create_user_prompt(query: str, retrieved_data: List[DataResponse], confidence_threshold: float) -> str:
+        """Create user prompt with retrieved data context."""
+        return "".join(AntiHallucinationPrompts.iter_user_prompt(query, retrieved_data, confidence_threshold))
+    
+    @staticmethod
+    def iter_user_prompt(query: str, retrieved_data: List[DataResponse], confidence_threshold: float) -> Iterator[str]:
+        """Yield the user prompt as ``str`` fragments.
+        
+        Joined, the fragments equal ``create_user_prompt``. They are text, not
+        a request body: callers writing the prompt incrementally must encode
+        them and place them inside their own request envelope (e.g. the
+        ``content`` of a JSON user message).
+        """
+        yield _render_user_prompt_header(query=query, confidence_threshold=confidence_threshold)
+        yield from _iter_sources_section(retrieved_data)
     
     @staticmethod
     def create_template(query: str, retrieved_data: List[DataResponse], confidence_threshold: float = 0.85) -> LLMPromptTemplate:
         """Create complete LLM prompt template."""
+        user_prompt = AntiHallucinationPrompts.create_user_prompt(
+            query,
+            retrieved_data,
+            confidence_threshold
+        )
+        
         return LLMPromptTemplate(
-            system_prompt=AntiHallucinationPrompts.create_strict_system_prompt(),
-            user_prompt=AntiHallucinationPrompts.create_user_prompt(query, retrieved_data, confidence_threshold),
+            system_prompt=_STRICT_SYSTEM_PROMPT,
+            user_prompt=user_prompt,
             retrieved_data=retrieved_data,
             strict_mode=True,
             confidence_threshold=confidence_threshold
         )
     
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop all memoized 'I don't know' responses."""
+        _format_dont_know.cache_clear()
+    
     @staticmethod
     def create_validation_prompt(query: str, llm_response: str, retrieved_data: List[DataResponse]) -> str:
         """Create prompt to validate LLM response against retrieved data."""
@@ -109,14 +189,13 @@ Provide validation result (PASS/FAIL) and explanation:"""
     @staticmethod
     def format_dont_know_response(reason: str, sources: List[DataResponse]) -> str:
         """Format a proper 'I don't know' response."""
-        response = f"I don't know. {reason}\n\n"
-        response += "Data Quality Summary:\n"
-        
-        for idx, source in enumerate(sources, 1):
-            response += f"- Source {idx} ({source.source_metadata.source_type.value}): "
-            if source.information_not_found:
-                response += "No information found\n"
-            else:
-                response += f"Confidence {source.confidence.score:.3f} - {source.confidence.reasoning}\n"
-        
-        return response
\ No newline at end of file
+        fingerprint = tuple(
+            (
+                _SOURCE_TYPE_VALUES[source.source_metadata.source_type],
+                source.information_not_found,
+                source.confidence.score,
+                source.confidence.reasoning
+            )
+            for source in sources
+        )
+        return _format_dont_know(reason, fingerprint)
@@ -0,0 +1,115 @@
+"""Tests for webhook queueing and per-record coalescing."""
+
+import asyncio
+import logging
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "test.test.test")
+os.environ.setdefault("NOTION_API_KEY", "test")
+os.environ.setdefault("NOTION_DATABASE_ID", "test")
+os.environ.setdefault("API_SECRET_KEY", "test")
+
+import pytest
+
+import main
+from models import WebhookPayload
+
+
+def make_payload(event_type: str, record_id: str = "1", **data) -> WebhookPayload:
+    """Build a Supabase webhook payload for a record."""
+    return WebhookPayload(
+        event_type=event_type,
+        source="supabase",
+        table_name="users",
+        record_id=record_id,
+        data=data
+    )
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    """Record processed payloads instead of running the real handler."""
+    seen = []
+
+    async def record(payload: WebhookPayload):
+        seen.append((payload.event_type, payload.record_id, payload.data))
+
+    monkeypatch.setattr(main, "process_webhook", record)
+    return seen
+
+
+def run_through_lifespan(payloads):
+    """Enqueue payloads back to back and let shutdown drain the queues."""
+    async def run():
+        async with main.lifespan(main.app):
+            for payload in payloads:
+                main.enqueue_webhook(payload)
+
+    asyncio.run(run())
+
+
+def test_insert_update_delete_are_all_processed_in_order(processed):
+    run_through_lifespan([
+        make_payload("insert", v=1),
+        make_payload("update", v=2),
+        make_payload("delete")
+    ])
+
+    assert processed == [
+        ("insert", "1", {"v": 1}),
+        ("update", "1", {"v": 2}),
+        ("delete", "1", {})
+    ]
+
+
+def test_consecutive_updates_coalesce_to_latest(processed):
+    run_through_lifespan([make_payload("update", v=v) for v in range(5)])
+
+    assert processed == [("update", "1", {"v": 4})]
+
+
+def test_update_after_delete_is_not_merged_into_earlier_update(processed):
+    run_through_lifespan([
+        make_payload("update", v=1),
+        make_payload("delete"),
+        make_payload("update", v=2)
+    ])
+
+    assert processed == [
+        ("update", "1", {"v": 1}),
+        ("delete", "1", {}),
+        ("update", "1", {"v": 2})
+    ]
+
+
+def test_other_records_are_not_coalesced(processed):
+    run_through_lifespan([make_payload("update", record_id=r, v=r) for r in "abc"])
+
+    assert sorted(processed) == [
+        ("update", "a", {"v": "a"}),
+        ("update", "b", {"v": "b"}),
+        ("update", "c", {"v": "c"})
+    ]
+
+
+def test_drain_timeout_reports_unfinished_and_dropped_events(monkeypatch, caplog):
+    started = []
+
+    async def stall(payload: WebhookPayload):
+        started.append(payload.record_id)
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(main, "process_webhook", stall)
+    monkeypatch.setattr(main.settings, "webhook_workers", 2)
+    # Large enough that every shard fits all four events whatever the routing
+    monkeypatch.setattr(main.settings, "webhook_queue_size", 8)
+    monkeypatch.setattr(main.settings, "webhook_shutdown_timeout", 0.05)
+    caplog.set_level(logging.WARNING, logger="main")
+
+    run_through_lifespan([make_payload("insert", record_id=r) for r in "abcd"])
+
+    # Workers take whole batches off the queue, so only some events started
+    assert len(started) < 4
+    assert "timed out with 4 event(s) unfinished" in caplog.text
+    assert "Dropped 4 dequeued webhook(s) on shutdown" in caplog.text
@@ -1,13 +1,79 @@
-from typing import List, Dict, Any, Optional
-from models import DataResponse, MultiSourceResponse, ConfidenceScore
+from typing import List, Dict, Any, Optional, Tuple, Final
+from models import DataResponse, MultiSourceResponse, ConfidenceScore, SourceType
 from config import settings
+from functools import lru_cache
+from types import MappingProxyType
 import hashlib
 import json
+import sys
+
+
+# Canonical form used for data hashes; json.dumps would build a new encoder per call
+_CANONICAL_JSON = json.JSONEncoder(sort_keys=True, default=str)
+
+
+def compute_data_hash(data: Any) -> str:
+    """Calculate the SHA-256 hash of data in its canonical JSON form."""
+    # Integrity check only, so the FIPS "used for security" path is not needed
+    payload = _CANONICAL_JSON.encode(data).encode()
+    return hashlib.sha256(payload, usedforsecurity=False).hexdigest()
+
+# Weighted average based on source reliability
+_SOURCE_WEIGHTS: Final = MappingProxyType({
+    SourceType.SUPABASE: 0.55,
+    SourceType.NOTION: 0.45
+})
+_DEFAULT_SOURCE_WEIGHT: Final = 0.5
+
+# Sentinel source IDs set by the database clients for empty/error responses
+_INVALID_SOURCE_IDS: Final = frozenset(map(sys.intern, ("none", "error", "unknown")))
+
+
+# Issue bits reported by DataValidator._validation_flags, in message order
+_ISSUE_NOT_VERIFIED = 1 << 0
+_ISSUE_LOW_CONFIDENCE = 1 << 1
+_ISSUE_NOT_FOUND = 1 << 2
+_ISSUE_INVALID_SOURCE_ID = 1 << 3
+_ISSUE_DATA_NONE = 1 << 4
+
+
+@lru_cache(maxsize=4096)
+def _validation_issues(
+    flags: int,
+    score: Optional[float],
+    source_id: Optional[str],
+    confidence_threshold: Optional[float]
+) -> Tuple[str, ...]:
+    """Materialize issue messages for a non-zero issue bitmask.
+    
+    ``score``/``confidence_threshold`` and ``source_id`` are only passed when
+    their bits are set, so unrelated values don't fragment the memo cache.
+    """
+    issues = []
+    
+    if flags & _ISSUE_NOT_VERIFIED:
+        issues.append("Data has not been verified against source")
+    
+    if flags & _ISSUE_LOW_CONFIDENCE:
+        issues.append("Confidence score %.3f below threshold %s" % (score, confidence_threshold))
+    
+    if flags & _ISSUE_NOT_FOUND:
+        issues.append("Information not found in source")
+    
+    if flags & _ISSUE_INVALID_SOURCE_ID:
+        issues.append("Invalid source ID: %s" % source_id)
+    
+    if flags & _ISSUE_DATA_NONE:
+        issues.append("Data is None but information_not_found is False")
+    
+    return tuple(issues)
 
 
 class DataValidator:
     """Validates data integrity and confidence thresholds."""
     
+    __slots__ = ('confidence_threshold',)
+    
     def __init__(self, confidence_threshold: Optional[float] = None):
         self.confidence_threshold = confidence_threshold or settings.confidence_threshold
     
@@ -17,31 +83,50 @@ class DataValidator:
         Returns:
             tuple: (is_valid, list_of_issues)
         """
-        issues = []
-        
-        # Check if verified
-        if not response.verified:
-            issues.append("Data has not been verified against source")
-        
-        # Check confidence threshold
-        if response.confidence.score < self.confidence_threshold:
-            issues.append(
-                f"Confidence score {response.confidence.score:.3f} below threshold {self.confidence_threshold}"
-            )
-        
-        # Check if information was found
-        if response.information_not_found:
-            issues.append("Information not found in source")
-        
-        # Validate source metadata
-        if response.source_metadata.source_id in ["none", "error", "unknown"]:
-            issues.append(f"Invalid source ID: {response.source_metadata.source_id}")
-        
-        # Verify data is not None when info should be found
-        if not response.information_not_found and response.data is None:
-            issues.append("Data is None but information_not_found is False")
+        threshold = self.confidence_threshold
+        flags = self._validation_flags(response, threshold)
+        if not flags:
+            return True, []
+        
+        low_confidence = flags & _ISSUE_LOW_CONFIDENCE
+        issues = _validation_issues(
+            flags,
+            response.confidence.score if low_confidence else None,
+            response.source_metadata.source_id if flags & _ISSUE_INVALID_SOURCE_ID else None,
+            threshold if low_confidence else None
+        )
+        return False, list(issues)
+    
+    def _validation_flags(self, response: DataResponse, threshold: float) -> int:
+        """Compute the issue bitmask for a single data response (0 means valid)."""
+        not_found = response.information_not_found
+        return (
+            # Check if verified
+            (not response.verified) * _ISSUE_NOT_VERIFIED
+            # Check confidence threshold
+            | (response.confidence.score < threshold) * _ISSUE_LOW_CONFIDENCE
+            # Check if information was found
+            | not_found * _ISSUE_NOT_FOUND
+            # Validate source metadata
+            | (response.source_metadata.source_id in _INVALID_SOURCE_IDS) * _ISSUE_INVALID_SOURCE_ID
+            # Verify data is not None when info should be found
+            | (not not_found and response.data is None) * _ISSUE_DATA_NONE
+        )
+    
+    def validate_batch(self, responses: List[DataResponse]) -> List[bool]:
+        """Validate many responses at once, e.g. candidates from a reranker.
         
-        return len(issues) == 0, issues
+        Returns:
+            list: validity flag per response, in input order
+        """
+        threshold = self.confidence_threshold
+        validation_flags = self._validation_flags
+        return [not validation_flags(r, threshold) for r in responses]
+    
+    @staticmethod
+    def clear_validation_cache() -> None:
+        """Drop memoized validation issue messages."""
+        _validation_issues.cache_clear()
     
     def validate_multi_source(self, response: MultiSourceResponse) -> tuple[bool, List[str]]:
         """Validate a multi-source response.
@@ -50,54 +135,43 @@ class DataValidator:
             tuple: (is_valid, list_of_issues)
         """
         issues = []
+        threshold = self.confidence_threshold
+        validate_response = self.validate_response
         
-        # Validate each source
+        # Validate each source in a single pass
         for idx, source_response in enumerate(response.sources):
-            is_valid, source_issues = self.validate_response(source_response)
+            is_valid, source_issues = validate_response(source_response)
             if not is_valid:
                 issues.append(f"Source {idx} ({source_response.source_metadata.source_type}): " + "; ".join(source_issues))
         
-        # Check aggregated confidence
-        if response.aggregated_confidence < self.confidence_threshold:
-            issues.append(
-                f"Aggregated confidence {response.aggregated_confidence:.3f} below threshold {self.confidence_threshold}"
-            )
-        
-        # Verify meets_threshold flag is correct
-        if response.meets_threshold and response.aggregated_confidence < self.confidence_threshold:
-            issues.append("meets_threshold is True but aggregated confidence is below threshold")
+        # Check aggregated confidence, and that the meets_threshold flag agrees
+        aggregated_confidence = response.aggregated_confidence
+        if aggregated_confidence < threshold:
+            issues.append("Aggregated confidence %.3f below threshold %s" % (aggregated_confidence, threshold))
+            if response.meets_threshold:
+                issues.append("meets_threshold is True but aggregated confidence is below threshold")
         
         return len(issues) == 0, issues
     
     def verify_data_hash(self, data: Any, expected_hash: str) -> bool:
         """Verify data integrity using hash."""
-        data_str = json.dumps(data, sort_keys=True, default=str)
-        actual_hash = hashlib.sha256(data_str.encode()).hexdigest()
-        return actual_hash == expected_hash
+        return compute_data_hash(data) == expected_hash
     
     def calculate_aggregated_confidence(self, responses: List[DataResponse]) -> float:
         """Calculate aggregated confidence from multiple sources."""
-        if not responses:
-            return 0.0
-        
-        # Filter out responses with no data found
-        valid_responses = [r for r in responses if not r.information_not_found]
-        
-        if not valid_responses:
-            return 0.0
-        
-        # Weighted average based on source reliability
-        weights = {
-            'supabase': 0.55,
-            'notion': 0.45
-        }
+        # Single source: the weight cancels out of the weighted average
+        if len(responses) == 1:
+            response = responses[0]
+            return 0.0 if response.information_not_found else round(response.confidence.score, 3)
         
         total_score = 0.0
         total_weight = 0.0
         
-        for response in valid_responses:
-            source_type = response.source_metadata.source_type.value
-            weight = weights.get(source_type, 0.5)
+        # Single pass; responses with no data found carry no weight
+        for response in responses:
+            if response.information_not_found:
+                continue
+            weight = _SOURCE_WEIGHTS.get(response.source_metadata.source_type, _DEFAULT_SOURCE_WEIGHT)
             total_score += response.confidence.score * weight
             total_weight += weight
         
@@ -105,23 +179,39 @@ class DataValidator:
     
     def should_return_dont_know(self, response: MultiSourceResponse) -> bool:
         """Determine if response should be 'I don't know' based on validation."""
-        # If information not found in all sources
-        if all(r.information_not_found for r in response.sources):
-            return True
-        
-        # If confidence is below threshold
+        # If confidence is below threshold (cheapest check first)
         if response.aggregated_confidence < self.confidence_threshold:
             return True
         
-        # If no sources are verified
-        if not any(r.verified for r in response.sources):
-            return True
-        
-        return False
+        # Otherwise "I don't know" unless some source has information and some
+        # source is verified; one pass, stopping as soon as both are seen
+        all_not_found = True
+        any_verified = False
+        for r in response.sources:
+            if not r.information_not_found:
+                all_not_found = False
+            if r.verified:
+                any_verified = True
+            if not all_not_found and any_verified:
+                return False
+        
+        return True
     
     def enforce_confidence_threshold(self, responses: List[DataResponse]) -> List[DataResponse]:
         """Filter responses to only include those meeting confidence threshold."""
+        threshold = self.confidence_threshold
         return [
             r for r in responses 
-            if r.confidence.score >= self.confidence_threshold and not r.information_not_found
-        ]
\ No newline at end of file
+            if r.confidence.score >= threshold and not r.information_not_found
+        ]
+    
+    def any_meets_confidence_threshold(self, responses: List[DataResponse]) -> bool:
+        """Check whether any response would survive enforce_confidence_threshold.
+        
+        Stops at the first match instead of building the filtered list.
+        """
+        threshold = self.confidence_threshold
+        return any(
+            r.confidence.score >= threshold and not r.information_not_found
+            for r in responses
+        )
\ No newline at end of file